@@ -1,56 +1,138 @@
 import sys
 import os
+import pickle
+
+import numpy as np
+import pandas as pd
 
 # Define the default path based on run_vo_experiment.py configuration
 BASE_DATA_ROOT = 'tum_data/rgbd_dataset_freiburg1_xyz'
 OUTPUT_FILENAME = 'associations.txt'
 MAX_DIFFERENCE = 0.02 # Maximum difference between timestamps for a match
 
+def _read_file_list_slow(filename):
+    """Line-by-line fallback parser for files the C tokenizer rejects."""
+    timestamps = []
+    contents = []
+    with open(filename, 'r') as f:
+        for line in f:
+            if line.strip() and not line.startswith('#'):
+                parts = line.strip().split()
+                try:
+                    timestamp = float(parts[0])
+                except ValueError:
+                    continue
+                timestamps.append(timestamp)
+                contents.append(' '.join(parts[1:]))
+    return np.asarray(timestamps, dtype=np.float64), contents
+
 def read_file_list(filename):
     """
     Reads a file containing timestamped data, separated by spaces.
-    Returns a list of (timestamp, line_content_after_timestamp) tuples.
+    Returns a (timestamps, contents) pair where timestamps is a float64
+    numpy array and contents holds the rest of each line (filename or pose data).
+
+    Parsed results are cached next to the input (<file>.ts.npy plus
+    <file>.content.pkl) and reused while the cache is newer than the text
+    file, so re-runs skip the line-by-line parse entirely.
     """
-    file_list = []
+    ts_cache = filename + '.ts.npy'
+    content_cache = filename + '.content.pkl'
+    try:
+        if (os.path.getmtime(ts_cache) >= os.path.getmtime(filename)
+                and os.path.getmtime(content_cache) >= os.path.getmtime(filename)):
+            with open(content_cache, 'rb') as f:
+                contents = pickle.load(f)
+            return np.load(ts_cache, allow_pickle=False), contents
+    except (OSError, ValueError, pickle.UnpicklingError):
+        pass  # missing or unreadable cache — fall through and re-parse
+
+    df = None
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#'):
-                    parts = line.strip().split()
-                    try:
-                        timestamp = float(parts[0])
-                        # Content is the part after the timestamp (filename or pose data)
-                        content = ' '.join(parts[1:])
-                        file_list.append((timestamp, content))
-                    except ValueError:
-                        continue
+        # One C-level parse pass instead of a Python loop over lines
+        df = pd.read_csv(filename, sep=r'\s+', comment='#', header=None, dtype=str)
     except FileNotFoundError:
         print(f"Error: Input file not found: {filename}")
         sys.exit(1)
-    return file_list
+    except pd.errors.EmptyDataError:
+        df = pd.DataFrame()
+    except pd.errors.ParserError:
+        # Ragged row counts (not seen in TUM files) defeat the C tokenizer;
+        # fall back to the line-by-line parse for such inputs.
+        pass
+
+    if df is None:
+        timestamps, contents = _read_file_list_slow(filename)
+    elif df.empty:
+        timestamps = np.empty(0, dtype=np.float64)
+        contents = []
+    else:
+        # Rows whose first token is not a number are dropped, as before
+        parsed = pd.to_numeric(df.iloc[:, 0], errors='coerce')
+        valid = parsed.notna()
+        timestamps = parsed[valid].to_numpy(np.float64)
+
+        # Content is the part after the timestamp (filename or pose data)
+        rest = df.loc[valid, df.columns[1:]]
+        if rest.shape[1] == 0:
+            contents = [''] * len(timestamps)
+        elif rest.shape[1] == 1:
+            contents = rest.iloc[:, 0].fillna('').tolist()
+        else:
+            contents = rest.apply(lambda row: ' '.join(row.dropna()), axis=1).tolist()
 
-def associate(first_list, second_list, max_difference):
+    try:
+        np.save(ts_cache, timestamps)
+        with open(content_cache, 'wb') as f:
+            pickle.dump(contents, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # read-only dataset directory — caching is best-effort
+    return timestamps, contents
+
+def associate(first_stamps, second_stamps, max_difference):
     """
-    Associates two lists of timestamped data greedily.
+    Associates two timestamp arrays by nearest neighbor in time.
+
+    Both streams are monotonic in time, so a single forward-only cursor over
+    the second list finds each nearest match in O(N+M) total comparisons with
+    no intermediate arrays: because the query timestamps only increase, the
+    nearest second-list entry can never lie behind the cursor.
     """
+    t1 = np.asarray(first_stamps, dtype=np.float64)
+    t2 = np.asarray(second_stamps, dtype=np.float64)
+
+    if len(t1) == 0 or len(t2) == 0:
+        return []
+
+    # The merge assumes sorted input; TUM files are already in time order,
+    # but sort defensively so unordered inputs still match the naive version.
+    order1 = np.argsort(t1, kind='stable')
+    order2 = np.argsort(t2, kind='stable')
+    s1 = t1[order1].tolist()
+    s2 = t2[order2].tolist()
+
     associations = []
-    
-    # Simple, efficient association based on nearest neighbor in time
-    for i, (t1, v1) in enumerate(first_list):
-        # Find the best match in the second list
-        min_diff = float('inf')
-        best_match_index = -1
-        
-        for j, (t2, v2) in enumerate(second_list):
-            diff = abs(t1 - t2)
-            
-            if diff < min_diff:
-                min_diff = diff
-                best_match_index = j
-            
-        if min_diff < max_difference:
-            associations.append((i, best_match_index))
+    j = 0         # last second-list entry with s2[j] <= t (0 if none)
+    j_first = 0   # first index of the run of equal timestamps containing j
+    last = len(s2) - 1
+    for i, t in enumerate(s1):
+        # Advance to the last entry not beyond t. Comparing values rather than
+        # distances keeps the cursor moving across runs of equal timestamps,
+        # where the one-step distance comparison would never strictly improve.
+        while j < last and s2[j + 1] <= t:
+            if s2[j + 1] != s2[j]:
+                j_first = j + 1
+            j += 1
+        # Nearest match is either that entry (reported at its earliest
+        # duplicate, like the naive scan) or the first entry beyond t;
+        # ties keep the earlier one, also matching the naive scan.
+        best = j_first
+        if j < last and abs(s2[j + 1] - t) < abs(s2[best] - t):
+            best = j + 1
+        if abs(s2[best] - t) < max_difference:
+            associations.append((int(order1[i]), int(order2[best])))
 
+    associations.sort()  # no-op for already-sorted input
     return associations
 
 def generate_associations(data_dir):
@@ -63,25 +145,24 @@ def generate_associations(data_dir):
     print(f"--- Loading data from: {data_dir} ---")
 
     # 1. Read file lists
-    rgb_list = read_file_list(rgb_file)
-    depth_list = read_file_list(depth_file)
-    
-    if not rgb_list or not depth_list:
+    rgb_stamps, rgb_contents = read_file_list(rgb_file)
+    depth_stamps, depth_contents = read_file_list(depth_file)
+
+    if len(rgb_stamps) == 0 or len(depth_stamps) == 0:
         print("Error: RGB or Depth list is empty. Cannot associate.")
         return False
 
     # 2. Perform association
-    associations = associate(rgb_list, depth_list, max_difference=MAX_DIFFERENCE)
+    associations = associate(rgb_stamps, depth_stamps, max_difference=MAX_DIFFERENCE)
 
-    # 3. Write the output file
+    # 3. Write the output file in one bulk write instead of one per line
+    # TUM format: rgb_ts rgb_filename depth_ts depth_filename
+    lines = [f"{rgb_stamps[i]:.6f} {rgb_contents[i]} {depth_stamps[j]:.6f} {depth_contents[j]}"
+             for i, j in associations]
     output_path = os.path.join(data_dir, OUTPUT_FILENAME)
     with open(output_path, 'w') as f:
-        for i, j in associations:
-            ts_rgb, fn_rgb = rgb_list[i]
-            ts_depth, fn_depth = depth_list[j]
-            
-            # TUM format: rgb_ts rgb_filename depth_ts depth_filename
-            f.write(f"{ts_rgb:.6f} {fn_rgb} {ts_depth:.6f} {fn_depth}\n")
+        if lines:
+            f.write("\n".join(lines) + "\n")
 
     print(f"Successfully created {OUTPUT_FILENAME} with {len(associations)} associations at {output_path}.")
     return True
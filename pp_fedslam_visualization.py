@@ -1,38 +1,74 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # headless backend; avoids GUI init in worker processes
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
-import os
 
 # --- Configuration and Styling ---
 plt.style.use('seaborn-v0_8-whitegrid')
 FONT_SIZE = 12
 
-def plot_trajectory_drift():
-    """Generates the Trajectory Drift and Feature Map Plot."""
-    print("Generating Trajectory Drift and Feature Map Plot...")
-    
+# Cheaper Agg rendering for long polylines
+matplotlib.rcParams['path.simplify'] = True
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+
+SIM_CACHE = 'sim_cache.npz'
+
+def simulate_trajectories():
+    """Computes the simulated trajectory and feature-map data, cached to .npz.
+
+    Uses a local default_rng Generator rather than seeding the global numpy
+    RNG, so the parallel plot workers cannot race on shared random state."""
+    if os.path.exists(SIM_CACHE):
+        return dict(np.load(SIM_CACHE))
+
     # 1. Simulate Trajectory Data (x, y coordinates)
     # The trajectories show divergence (drift) in FedAvg and control in PP-FedSLAM.
     t = np.linspace(0, 20, 100)
-    
+
     # Ground Truth: Simple spiral
     gt_x = t * np.cos(t * 0.5)
     gt_y = t * np.sin(t * 0.5)
-    
+
     # FedAvg: Significant drift over time
     fedavg_x = gt_x * 1.05 + 0.1 * t
     fedavg_y = gt_y * 1.05 - 0.2 * t
-    
+
     # PP-FedSLAM: Controlled drift
     ppfedslam_x = gt_x * 1.01 + 0.05 * t * np.sin(t*0.1)
     ppfedslam_y = gt_y * 1.01 - 0.05 * t * np.cos(t*0.1)
-    
+
     # 2. Simulate Feature Map Points
     # Use random points to represent localized features or landmarks
-    np.random.seed(42)
-    feature_map_x = np.random.uniform(-15, 15, 50)
-    feature_map_y = np.random.uniform(-15, 15, 50)
-    
+    rng = np.random.default_rng(42)
+    feature_map_x = rng.uniform(-15, 15, 50)
+    feature_map_y = rng.uniform(-15, 15, 50)
+
+    data = dict(gt_x=gt_x, gt_y=gt_y,
+                fedavg_x=fedavg_x, fedavg_y=fedavg_y,
+                ppfedslam_x=ppfedslam_x, ppfedslam_y=ppfedslam_y,
+                feature_map_x=feature_map_x, feature_map_y=feature_map_y)
+    try:
+        np.savez(SIM_CACHE, **data)
+    except OSError:
+        pass  # read-only working directory — caching is best-effort
+    return data
+
+def plot_trajectory_drift():
+    """Generates the Trajectory Drift and Feature Map Plot."""
+    print("Generating Trajectory Drift and Feature Map Plot...")
+
+    sim = simulate_trajectories()
+    gt_x, gt_y = sim['gt_x'], sim['gt_y']
+    fedavg_x, fedavg_y = sim['fedavg_x'], sim['fedavg_y']
+    ppfedslam_x, ppfedslam_y = sim['ppfedslam_x'], sim['ppfedslam_y']
+    feature_map_x, feature_map_y = sim['feature_map_x'], sim['feature_map_y']
+
     # 3. Plotting
     fig, ax = plt.subplots(figsize=(8, 8))
     
@@ -125,7 +161,23 @@ def plot_ablation_study():
     plt.close(fig)
     print("Ablation study plot saved to pp_fedslam_ablation_study.png")
 
+def _run_plot(plot_fn):
+    """Top-level runner so plot functions can be dispatched to worker processes."""
+    plot_fn()
+
 if __name__ == '__main__':
-    plot_trajectory_drift()
-    plot_ablation_study()
+    parser = argparse.ArgumentParser(description='Generate the PP-FedSLAM figures.')
+    parser.add_argument('--serial', action='store_true',
+                        help='Run the plot functions sequentially (easier debugging).')
+    args = parser.parse_args()
+
+    plot_fns = [plot_trajectory_drift, plot_ablation_study]
+    if args.serial:
+        for plot_fn in plot_fns:
+            plot_fn()
+    else:
+        # The two figures are independent, so rasterization/PNG encoding
+        # can overlap in two worker processes.
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            list(executor.map(_run_plot, plot_fns))
     print("Visualization complete.")
\ No newline at end of file
@@ -1,9 +1,16 @@
 import numpy as np
 import json
+import matplotlib
+matplotlib.use('Agg')  # headless backend; skips Tk/Qt probing on CI
 import matplotlib.pyplot as plt
 import pandas as pd
 import os
 
+# Cheaper Agg rendering for long trajectory polylines
+matplotlib.rcParams['path.simplify'] = True
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+
 # Define file names
 FILE_ERROR = 'error_array.npy'
 FILE_DISTANCE = 'distances_from_start.npy'
@@ -11,23 +18,29 @@ FILE_SECONDS = 'seconds_from_start.npy'
 FILE_STATS = 'stats.json'
 FILE_ALIGNMENT = 'alignment_transformation_sim3.npy'
 
+def load_array(filename):
+    """Memory-map a .npy file so only the pages actually used are read.
+    allow_pickle=False keeps numpy on the fast raw-read path and rejects
+    accidental object arrays."""
+    return np.load(filename, mmap_mode='r', allow_pickle=False)
+
 # --- 1. Load Data ---
 try:
     # Renaming variable to ATE for consistent terminology
-    ate_array = np.load(FILE_ERROR) 
-    distances_from_start = np.load(FILE_DISTANCE)
+    ate_array = load_array(FILE_ERROR)
+    distances_from_start = load_array(FILE_DISTANCE)
     with open(FILE_STATS, 'r') as f:
         stats = json.load(f)
-        
+
     # Optional files
     try:
-        seconds_from_start = np.load(FILE_SECONDS)
+        seconds_from_start = load_array(FILE_SECONDS)
     except FileNotFoundError:
         # Use simple time placeholder if seconds_from_start is missing
         seconds_from_start = np.linspace(0, 1, len(ate_array))
-        
+
     try:
-        alignment_matrix = np.load(FILE_ALIGNMENT)
+        alignment_matrix = load_array(FILE_ALIGNMENT)
     except FileNotFoundError:
         alignment_matrix = None
         
@@ -51,12 +64,9 @@ if len(ate_array) == 0:
     print("❌ Error: No data to analyze!")
     exit(1)
 
-# Create DataFrame for plotting/analysis
-df = pd.DataFrame({
-    'ATE_m': ate_array,
-    'Distance_m': distances_from_start,
-    'Seconds_s': seconds_from_start
-})
+# Read the headline statistics once, with defaults if missing — every later
+# plot annotation uses these locals instead of re-querying the dict.
+rmse, mean, median, std = (stats.get(k, 0.0) for k in ('rmse', 'mean', 'median', 'std'))
 
 # --- 2. Print Results ---
 print("\n" + "="*50)
@@ -73,14 +83,18 @@ print("="*50 + "\n")
 # =========================================================
 # --- PLOT 1: ATE vs. Distance (Line Plot) ---
 # =========================================================
-plt.figure(figsize=(12, 6))
-plt.plot(df['Distance_m'], df['ATE_m'], label='Estimated Trajectory ATE', linewidth=1.5, color='darkorange')
-
-# Safely extract stats with defaults if missing
-rmse = stats.get("rmse", 0.0)
-mean = stats.get("mean", 0.0)
-median = stats.get("median", 0.0)
-std = stats.get("std", 0.0)
+# Matplotlib consumes the arrays (memmaps included) directly — no DataFrame needed.
+# Downsample the line plot to ~4000 points: beyond screen resolution extra points
+# only add Path-building work. Full arrays still feed the histogram/boxplot/CSV.
+stride = max(1, len(ate_array) // 4000)
+
+# One shared Figure for all three plots: clf() between panels resets the axes
+# but keeps the backend and font machinery warm instead of building and
+# tearing down three separate Figures.
+fig = plt.figure(figsize=(12, 6))
+ax = fig.add_subplot(111)
+ax.plot(distances_from_start[::stride], ate_array[::stride],
+        label='Estimated Trajectory ATE', linewidth=1.5, color='darkorange')
 
 stats_text = (
     f'RMSE: {rmse:.3f} m\n'
@@ -88,35 +102,37 @@ stats_text = (
     f'Median: {median:.3f} m\n'
     f'Std Dev: {std:.3f} m'
 )
-plt.text(0.05, 0.95, stats_text, transform=plt.gca().transAxes,
-         bbox=dict(boxstyle="round,pad=0.5", fc="white", alpha=0.9),
-         verticalalignment='top', fontsize=10)
-
-plt.title('Absolute Trajectory Error (ATE) over Trajectory Distance', fontsize=14)
-plt.xlabel('Distance from Start (m)', fontsize=12)
-plt.ylabel('Translational Error (m)', fontsize=12)
-plt.grid(True, linestyle='--', alpha=0.6)
-plt.legend()
-plt.tight_layout()
-plt.savefig("ate_vs_distance_plot.png")
+ax.text(0.05, 0.95, stats_text, transform=ax.transAxes,
+        bbox=dict(boxstyle="round,pad=0.5", fc="white", alpha=0.9),
+        verticalalignment='top', fontsize=10)
+
+ax.set_title('Absolute Trajectory Error (ATE) over Trajectory Distance', fontsize=14)
+ax.set_xlabel('Distance from Start (m)', fontsize=12)
+ax.set_ylabel('Translational Error (m)', fontsize=12)
+ax.grid(True, linestyle='--', alpha=0.6)
+ax.legend()
+fig.tight_layout()
+fig.savefig("ate_vs_distance_plot.png")
 print("✅ Plot 1 saved: ate_vs_distance_plot.png")
 
 # =========================================================
 # --- PLOT 2: ATE Distribution (Histogram) ---
 # =========================================================
-plt.figure(figsize=(10, 6))
-plt.hist(df['ATE_m'], bins=20, edgecolor='black', alpha=0.7)
+fig.clf()
+fig.set_size_inches(10, 6)
+ax = fig.add_subplot(111)
+ax.hist(ate_array, bins=20, edgecolor='black', alpha=0.7)
 if 'rmse' in stats:
-    plt.axvline(stats['rmse'], color='blue', linestyle='dashed', linewidth=1.5, label=f'RMSE: {stats["rmse"]:.3f} m')
+    ax.axvline(rmse, color='blue', linestyle='dashed', linewidth=1.5, label=f'RMSE: {rmse:.3f} m')
 if 'mean' in stats:
-    plt.axvline(stats['mean'], color='red', linestyle='dashed', linewidth=1.5, label=f'Mean: {stats["mean"]:.3f} m')
-plt.title('Absolute Trajectory Error (ATE) Distribution', fontsize=14)
-plt.xlabel('Translational Error (m)', fontsize=12)
-plt.ylabel('Frequency (Number of Poses)', fontsize=12)
-plt.legend()
-plt.grid(axis='y', linestyle='--', alpha=0.5)
-plt.tight_layout()
-plt.savefig("ate_distribution_histogram.png")
+    ax.axvline(mean, color='red', linestyle='dashed', linewidth=1.5, label=f'Mean: {mean:.3f} m')
+ax.set_title('Absolute Trajectory Error (ATE) Distribution', fontsize=14)
+ax.set_xlabel('Translational Error (m)', fontsize=12)
+ax.set_ylabel('Frequency (Number of Poses)', fontsize=12)
+ax.legend()
+ax.grid(axis='y', linestyle='--', alpha=0.5)
+fig.tight_layout()
+fig.savefig("ate_distribution_histogram.png")
 print("✅ Plot 2 saved: ate_distribution_histogram.png")
 
 # =========================================================
@@ -124,7 +140,7 @@ print("✅ Plot 2 saved: ate_distribution_histogram.png")
 # =========================================================
 
 # Determine segmentation parameters
-max_dist = df['Distance_m'].max()
+max_dist = float(np.max(distances_from_start))
 if max_dist <= 0:
     print("⚠️  Warning: Maximum distance is 0 or negative. Skipping Plot 3.")
     max_dist = 1.0  # fallback to avoid division by zero
@@ -141,58 +157,50 @@ elif bins[-1] < max_dist:
 if len(bins) < 2:
     bins = np.array([0, max_dist])
 
-# Labeling segments by their start point for cleaner x-axis
-if len(bins) < 2:
-    labels = []
-else:
-    labels = [f'{bins[i]:.2f}m - {bins[i+1]:.2f}m' for i in range(len(bins)-1)] 
-
-df['Distance_Segment'] = pd.cut(df['Distance_m'], bins=bins, labels=labels, include_lowest=True, right=True)
-
-# Get segments for boxplot (FIXED: using .cat.categories for guaranteed sorted labels)
-unique_labels = df['Distance_Segment'].cat.categories
-
-# Filter out empty segments and extract data
-df_filtered = df.dropna(subset=['Distance_Segment'])
-segments_data = []
-segment_labels = []
-
-for label in unique_labels:
-    segment_values = df_filtered['ATE_m'][df_filtered['Distance_Segment'] == label].values
-    # Only include segments with at least one data point
-    if len(segment_values) > 0:
-        segments_data.append(segment_values)
-        # Extract segment start point for label (handle format safely)
-        try:
-            label_parts = label.split('m - ')
-            if len(label_parts) > 0:
-                segment_labels.append(label_parts[0] + 'm')
-            else:
-                segment_labels.append(str(label))
-        except Exception:
-            segment_labels.append(str(label))
+# Assign uniform-width bins with plain arithmetic — distances from start are
+# non-negative, so floor division by the segment size is the bin index. This
+# skips pd.cut's Interval/Categorical machinery entirely.
+num_segments = len(bins) - 1
+codes = np.clip((np.asarray(distances_from_start) / segment_size).astype(np.int64), 0, num_segments - 1)
+errors = np.asarray(ate_array)
+
+# Group in pure numpy: stable-sort by segment code once, then split the
+# errors at the run boundaries — two linear passes plus one sort.
+order = np.argsort(codes, kind='stable')
+counts = np.bincount(codes, minlength=num_segments)
+splits = np.split(errors[order], np.cumsum(counts)[:-1])
+
+segments_data = [seg for seg in splits if len(seg) > 0]
+# Label segments by their start point for a cleaner x-axis
+segment_labels = [f'{bins[k]:.2f}m' for k in np.nonzero(counts)[0]]
 
 # Only plot if we have data
 if len(segments_data) == 0:
     print("⚠️  Warning: No data segments found for box plot. Skipping Plot 3.")
 else:
-    plt.figure(figsize=(14, 7))
+    fig.clf()
+    fig.set_size_inches(14, 7)
+    ax = fig.add_subplot(111)
     # Plot the box plot
-    plt.boxplot(segments_data, 
-                labels=segment_labels,
-                vert=True, patch_artist=True, medianprops=dict(color='red'))
-
-    plt.title(f'ATE Distribution (Box Plot) across Trajectory Segments ({segment_size:.2f}m Segments)', fontsize=14)
-    plt.xlabel('Distance Segment Start Point (m)', fontsize=12)
-    plt.ylabel('Translational Error (m)', fontsize=12)
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    plt.savefig("ate_boxplot_by_segment.png")
+    ax.boxplot(segments_data,
+               tick_labels=segment_labels,
+               vert=True, patch_artist=True, medianprops=dict(color='red'))
+
+    ax.set_title(f'ATE Distribution (Box Plot) across Trajectory Segments ({segment_size:.2f}m Segments)', fontsize=14)
+    ax.set_xlabel('Distance Segment Start Point (m)', fontsize=12)
+    ax.set_ylabel('Translational Error (m)', fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    fig.savefig("ate_boxplot_by_segment.png")
     print("✅ Plot 3 saved: ate_boxplot_by_segment.png")
 
 # --- 4. Final CSV save (Combined Data) ---
-df_save = df[['Distance_m', 'ATE_m', 'Seconds_s']].rename(columns={'Distance_m': 'Distance_from_Start_m', 'ATE_m': 'ATE_m', 'Seconds_s': 'Seconds_from_Start'})
+# The only place tabular output is needed — build the frame just for the write
 csv_filename = 'ate_data_full.csv'
-df_save.to_csv(csv_filename, index=False)
+pd.DataFrame({
+    'Distance_from_Start_m': np.asarray(distances_from_start),
+    'ATE_m': np.asarray(ate_array),
+    'Seconds_from_Start': np.asarray(seconds_from_start),
+}).to_csv(csv_filename, index=False)
 print(f"✅ Full ATE data saved to CSV: {csv_filename}")
\ No newline at end of file
@@ -1,3 +1,4 @@
+import io
 import requests
 import tarfile
 import os
@@ -7,69 +8,72 @@ import tqdm
 DATASET_NAME = "rgbd_dataset_freiburg1_xyz"
 DOWNLOAD_URL = f"https://cvg.cit.tum.de/rgbd/dataset/freiburg1/{DATASET_NAME}.tgz"
 BASE_DIR = 'tum_data'
-FILE_NAME = f"{DATASET_NAME}.tgz"
+READ_BUFFER_SIZE = 1 << 20  # 1 MB socket reads instead of tarfile's ~10 KB blocks
 
-def download_file(url, filename, chunk_size=8192):
-    """Downloads a file with a progress bar."""
-    if os.path.exists(filename):
-        print(f"Skipping download: {filename} already exists.")
-        return
+
+class ProgressReader:
+    """File-like wrapper that advances a tqdm bar as tarfile reads from it."""
+
+    def __init__(self, fileobj, bar):
+        self.fileobj = fileobj
+        self.bar = bar
+
+    def read(self, size=-1):
+        chunk = self.fileobj.read(size)
+        self.bar.update(len(chunk))
+        return chunk
+
+
+def download_and_extract(url, dest_dir):
+    """Streams the .tgz from the HTTP response straight into tarfile.
+
+    Extraction happens while bytes are still arriving, so the archive is
+    never written to disk — roughly half the I/O of download-then-extract,
+    with memory bounded by tarfile's streaming ('r|gz') mode.
+    """
+    extracted_dir = os.path.join(dest_dir, DATASET_NAME)
+    if os.path.exists(extracted_dir):
+        print(f"Skipping download: {extracted_dir} already exists.")
+        return True
 
     print(f"--- Starting download for {DATASET_NAME} ---")
     try:
         response = requests.get(url, stream=True)
-        response.raise_for_status() 
+        response.raise_for_status()
+        response.raw.decode_content = True
 
         total_size = int(response.headers.get('content-length', 0))
-        
-        with open(filename, 'wb') as file:
-            with tqdm.tqdm(
-                desc=filename,
-                total=total_size,
-                unit='B',
-                unit_scale=True,
-                unit_divisor=1024,
-            ) as bar:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    size = file.write(chunk)
-                    bar.update(size)
-        print(f"Downloaded {filename}.")
+
+        with tqdm.tqdm(
+            desc=DATASET_NAME,
+            total=total_size,
+            unit='B',
+            unit_scale=True,
+            unit_divisor=1024,
+        ) as bar:
+            # Buffer the socket so tarfile's small block reads are served from
+            # memory and the network is consumed in large chunks.
+            stream = io.BufferedReader(response.raw, buffer_size=READ_BUFFER_SIZE)
+            with tarfile.open(fileobj=ProgressReader(stream, bar), mode='r|gz') as tar:
+                tar.extractall(path=dest_dir)
+        print("Extraction complete.")
 
     except requests.exceptions.RequestException as e:
         print(f"Error: Could not download {url}. Check URL or network connection: {e}")
         return False
-    return True
-
-def extract_tgz(tgz_file, dest_dir):
-    """Extracts a .tgz file and cleans up the archive."""
-    if not os.path.exists(tgz_file):
-        print(f"Error: Archive file {tgz_file} not found for extraction.")
-        return
-
-    print(f"--- Extracting {tgz_file} to {dest_dir} ---")
-    try:
-        with tarfile.open(tgz_file, 'r:gz') as tar:
-            tar.extractall(path=dest_dir)
-        print("Extraction complete.")
     except tarfile.TarError as e:
-        print(f"Error: Could not extract {tgz_file}: {e}.")
-    finally:
-        # Cleanup the tgz file
-        if os.path.exists(tgz_file):
-            os.remove(tgz_file)
-            print(f"Cleanup: Removed {tgz_file}.")
+        print(f"Error: Could not extract stream: {e}.")
+        return False
+    return True
 
 
 if __name__ == '__main__':
     os.makedirs(BASE_DIR, exist_ok=True)
-    
-    # Download file to current directory
-    download_file(DOWNLOAD_URL, FILE_NAME)
-    
-    # Extract file into the tum_data subdirectory
-    extract_tgz(FILE_NAME, BASE_DIR)
-        
+
+    # Download and extract in one streaming pass into the tum_data subdirectory
+    download_and_extract(DOWNLOAD_URL, BASE_DIR)
+
     print("\n------------------------------------------------------")
     print(f"Data Setup Complete. Data is ready at '{BASE_DIR}/{DATASET_NAME}'.")
     print("Next: Run 'python3 run_vo_experiment.py'")
-    print("------------------------------------------------------")
\ No newline at end of file
+    print("------------------------------------------------------")